@@ -0,0 +1,148 @@
+import io
+import logging
+import threading
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from models import load_contractors
+
+logger = logging.getLogger(__name__)
+
+# Raw fields the columnar view is built from; a record is only re-normalized when one of these changes
+SOURCE_FIELDS = ('name', 'location', 'rating', 'founding_year', 'number_of_employees', 'last_updated')
+
+REVIEW_COUNT_BINS = [0, 1, 2, 5, 10, 20, 50, float('inf')]
+REVIEW_COUNT_LABELS = ['0', '1', '2-4', '5-9', '10-19', '20-49', '50+']
+AGE_BINS = [0, 5, 10, 20, 30, 50, float('inf')]
+AGE_LABELS = ['0-4', '5-9', '10-19', '20-29', '30-49', '50+']
+
+def _fingerprint(contractor):
+    return tuple(getattr(contractor, field) for field in SOURCE_FIELDS) + (len(contractor.reviews),)
+
+def normalize_contractors(contractors):
+    """Build a typed DataFrame from Contractor records, indexed by contractor_id"""
+    raw = pd.DataFrame.from_records(
+        [tuple(getattr(c, field) for field in ('contractor_id',) + SOURCE_FIELDS) for c in contractors],
+        columns=('contractor_id',) + SOURCE_FIELDS
+    )
+    frame = pd.DataFrame(index=pd.Index(raw['contractor_id'].astype('string'), name='contractor_id'))
+    frame['name'] = raw['name'].astype('string').values
+
+    # "Brooklyn, NY" -> city / state
+    location = raw['location'].astype('string').str.extract(r'^\s*(?P<city>.*?)\s*,\s*(?P<state>[A-Za-z]{2})\s*$')
+    frame['city'] = location['city'].values
+    frame['state'] = location['state'].str.upper().values
+
+    frame['rating'] = pd.to_numeric(raw['rating'], errors='coerce').astype('Float64').values
+
+    current_year = datetime.now().year
+    founding_year = pd.to_numeric(raw['founding_year'], errors='coerce').astype('Int64')
+    founding_year = founding_year.where((founding_year >= 1800) & (founding_year <= current_year))
+    frame['founding_year'] = founding_year.values
+    frame['age_years'] = (current_year - founding_year).values
+
+    # Employee counts come as free text ("1-5", "1 - 5", "more than 5", "12"); keep the lower bound
+    employees = raw['number_of_employees'].astype('string').str.strip().str.lower()
+    range_low = employees.str.extract(r'^(\d+)\s*(?:-|to)\s*\d+$')[0]
+    more_than = pd.to_numeric(employees.str.extract(r'^(?:more than|over)\s*(\d+)$')[0]) + 1
+    exact = employees.str.extract(r'^(\d+)\+?$')[0]
+    frame['number_of_employees'] = (
+        pd.to_numeric(range_low).fillna(more_than).fillna(pd.to_numeric(exact)).astype('Int64').values
+    )
+
+    frame['review_count'] = pd.array([len(c.reviews) for c in contractors], dtype='int64')
+    frame['last_updated'] = pd.to_datetime(raw['last_updated'], errors='coerce').values
+    return frame
+
+class ContractorFrame:
+    """Cached columnar view of data/contractors.json, rebuilt incrementally when records change"""
+
+    def __init__(self, data_file="data/contractors.json"):
+        self.data_file = Path(data_file)
+        self._frame = normalize_contractors([])
+        self._fingerprints = {}
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        """Return the current frame, reloading the data file only if it changed on disk"""
+        with self._lock:
+            try:
+                mtime = self.data_file.stat().st_mtime
+            except FileNotFoundError:
+                return self._frame
+            if mtime != self._mtime:
+                try:
+                    contractors = load_contractors(self.data_file)
+                except Exception as e:
+                    # The scraper may be mid-write; keep serving the previous frame
+                    logger.error(f"Error loading contractors for analytics: {e}")
+                    return self._frame
+                self._update(contractors)
+                self._mtime = mtime
+            return self._frame
+
+    def update(self, contractors):
+        with self._lock:
+            self._update(contractors)
+            return self._frame
+
+    def _update(self, contractors):
+        # Duplicate IDs keep the last record, matching how the scraper merges saves
+        latest = {c.contractor_id: c for c in contractors if c.contractor_id}
+        fingerprints = {contractor_id: _fingerprint(c) for contractor_id, c in latest.items()}
+        changed = [c for contractor_id, c in latest.items() if self._fingerprints.get(contractor_id) != fingerprints[contractor_id]]
+        removed = self._fingerprints.keys() - fingerprints.keys()
+        if not changed and not removed:
+            return
+
+        stale_ids = list(removed) + [c.contractor_id for c in changed]
+        kept = self._frame.drop(index=stale_ids, errors='ignore')
+        if not changed:
+            self._frame = kept
+        elif len(kept):
+            # Re-added rows land at the end; restore the data file's order
+            self._frame = pd.concat([kept, normalize_contractors(changed)]).reindex(pd.Index(list(latest), dtype='string', name='contractor_id'))
+        else:
+            self._frame = normalize_contractors(changed)
+        self._fingerprints = fingerprints
+        logger.info(f"Analytics frame updated: {len(changed)} changed, {len(removed)} removed, {len(self._frame)} total")
+
+def _counts(series):
+    return {str(key): int(value) for key, value in series.items()}
+
+def compute_stats(frame, top_cities=20):
+    """Aggregate statistics over a normalized contractor frame"""
+    rating = frame['rating'].dropna()
+    location = frame['city'].str.cat(frame['state'], sep=', ')
+    return {
+        'total_contractors': int(len(frame)),
+        'rating': {
+            'mean': round(float(rating.mean()), 2) if len(rating) else None,
+            'median': float(rating.median()) if len(rating) else None,
+            'distribution': _counts(rating.round(1).value_counts().sort_index(ascending=False)),
+        },
+        'by_state': _counts(frame['state'].value_counts()),
+        'by_city': _counts(location.value_counts().head(top_cities)),
+        'review_count_histogram': _counts(
+            pd.cut(frame['review_count'], bins=REVIEW_COUNT_BINS, labels=REVIEW_COUNT_LABELS, right=False).value_counts(sort=False)
+        ),
+        'age_histogram': _counts(
+            pd.cut(frame['age_years'].astype('float'), bins=AGE_BINS, labels=AGE_LABELS, right=False).value_counts(sort=False)
+        ),
+        'total_reviews': int(frame['review_count'].sum()),
+    }
+
+def export_frame(frame, fmt):
+    """Serialize the frame to CSV or Parquet bytes"""
+    buffer = io.BytesIO()
+    if fmt == 'csv':
+        frame.to_csv(buffer)
+    elif fmt == 'parquet':
+        frame.to_parquet(buffer)
+    else:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    buffer.seek(0)
+    return buffer
@@ -0,0 +1,67 @@
+"""Compare the legacy dict/indented-JSON storage with the compact Contractor model.
+
+Usage: python3 benchmark.py [number_of_contractors]
+
+Synthetic datasets are built by repeating the records in data/contractors.json.
+"""
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from models import Contractor, load_contractors, save_contractors
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def _memory(func):
+    tracemalloc.start()
+    result = func()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, size
+
+def _build_dataset(size):
+    with open("data/contractors.json", 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    seed = data if isinstance(data, list) else [c.to_dict() for c in load_contractors()]
+    return [dict(seed[i % len(seed)], contractor_id=str(i)) for i in range(size)]
+
+def _save_legacy(records, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+
+def _load_legacy(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def main(size):
+    records = _build_dataset(size)
+    contractors = [Contractor.from_dict(c) for c in records]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = Path(tmp) / "legacy.json"
+        compact_path = Path(tmp) / "compact.json"
+
+        _, legacy_save = _timed(lambda: _save_legacy(records, legacy_path))
+        _, compact_save = _timed(lambda: save_contractors(contractors, compact_path))
+        _, legacy_load = _timed(lambda: _load_legacy(legacy_path))
+        _, compact_load = _timed(lambda: load_contractors(compact_path))
+        _, legacy_memory = _memory(lambda: _load_legacy(legacy_path))
+        _, compact_memory = _memory(lambda: load_contractors(compact_path))
+        legacy_bytes = legacy_path.stat().st_size
+        compact_bytes = compact_path.stat().st_size
+
+    print(f"{size} contractors")
+    print(f"{'':<20}{'legacy':>14}{'compact':>14}")
+    print(f"{'save (s)':<20}{legacy_save:>14.3f}{compact_save:>14.3f}")
+    print(f"{'load (s)':<20}{legacy_load:>14.3f}{compact_load:>14.3f}")
+    print(f"{'file size (MB)':<20}{legacy_bytes / 1e6:>14.1f}{compact_bytes / 1e6:>14.1f}")
+    print(f"{'bytes per record':<20}{legacy_memory / size:>14.0f}{compact_memory / size:>14.0f}")
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -29,8 +29,39 @@ class CacheManager:
         if contractor_id not in self.cache["contractors"]:
             self.cache["contractors"][contractor_id] = {}
         self.cache["contractors"][contractor_id]["last_modified"] = last_modified
+        self.cache["contractors"][contractor_id]["last_updated"] = datetime.now().isoformat()
+        self.cache["contractors"][contractor_id]["listing_changed"] = False
         self._save_cache()
         
+    def record_refresh_attempt(self, contractor_id):
+        entry = self.cache["contractors"].setdefault(contractor_id, {})
+        entry["last_refresh_attempt"] = datetime.now().isoformat()
+        self._save_cache()
+        
+    def get_refresh_attempt(self, contractor_id):
+        return self.cache["contractors"].get(contractor_id, {}).get("last_refresh_attempt")
+        
+    def get_contractor_last_updated(self, contractor_id):
+        return self.cache["contractors"].get(contractor_id, {}).get("last_updated")
+        
+    def update_listing(self, contractor_id, listing):
+        """Record the search listing fields, flagging the contractor if they changed"""
+        entry = self.cache["contractors"].setdefault(contractor_id, {})
+        previous = entry.get("listing")
+        if previous == listing:
+            return False
+        entry["listing"] = listing
+        # A first sighting isn't a change; the profile fetch will fill it in
+        entry["listing_changed"] = previous is not None
+        self._save_cache()
+        return entry["listing_changed"]
+        
+    def get_listing(self, contractor_id):
+        return self.cache["contractors"].get(contractor_id, {}).get("listing")
+        
+    def listing_changed(self, contractor_id):
+        return self.cache["contractors"].get(contractor_id, {}).get("listing_changed", False)
+        
     def needs_update(self, contractor_id, current_last_modified):
         cached_last_modified = self.get_contractor_last_modified(contractor_id)
         if not cached_last_modified:
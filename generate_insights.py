@@ -1,9 +1,9 @@
-import json
 import openai
 import os
 from pathlib import Path
 import logging
 from dotenv import load_dotenv
+from models import load_contractors, save_contractors
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,23 +22,22 @@ def load_contractor_data():
         logger.error("No contractor data file found")
         return None
     
-    with open(data_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_contractors(data_file)
 
 def generate_insight(contractor):
     """Generate an AI insight for a contractor using OpenAI API"""
     # Prepare the prompt with relevant information
     prompt = f"""Please provide a 2-3 sentence summary about this roofing contractor based on their information and customer reviews:
 
-Company Name: {contractor['name']}
-Location: {contractor['location']}
-Founded: {contractor.get('founding_year', 'Not specified')}
-Number of Employees: {contractor.get('number_of_employees', 'Not specified')}
-Rating: {contractor.get('rating', 'Not specified')}
-State License: {contractor.get('state_license', 'Not specified')}
+Company Name: {contractor.name}
+Location: {contractor.location}
+Founded: {contractor.founding_year or 'Not specified'}
+Number of Employees: {contractor.number_of_employees or 'Not specified'}
+Rating: {contractor.rating or 'Not specified'}
+State License: {contractor.state_license or 'Not specified'}
 
 Customer Reviews:
-{chr(10).join(contractor.get('reviews', []))}
+{chr(10).join(review.to_legacy() for review in contractor.reviews)}
 
 Please focus on summarizing the company's experience, reliability, and what customers appreciate about their service."""
 
@@ -65,8 +64,7 @@ Please focus on summarizing the company's experience, reliability, and what cust
 def save_updated_data(data):
     """Save the updated data back to the JSON file"""
     output_file = Path("data/contractors.json")
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    save_contractors(data, output_file)
     logger.info(f"Updated data saved to {output_file}")
 
 def generate_insights():
@@ -87,14 +85,14 @@ def generate_insights():
     
     # Process each contractor
     for contractor in contractors:
-        logger.info(f"Generating insight for {contractor['name']}...")
+        logger.info(f"Generating insight for {contractor.name}...")
         insight = generate_insight(contractor)
         if insight:
-            contractor['ai_insight'] = insight
+            contractor.ai_insight = insight
             logger.info(f"Generated insight: {insight}")
         else:
-            contractor['ai_insight'] = None
-            logger.warning(f"Failed to generate insight for {contractor['name']}")
+            contractor.ai_insight = None
+            logger.warning(f"Failed to generate insight for {contractor.name}")
     
     # Save the updated data
     save_updated_data(contractors)
@@ -0,0 +1,185 @@
+import gc
+import hashlib
+import json
+import os
+import re
+import sys
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+
+# Written at the top of data/contractors.json so loaders can tell it from the legacy list-of-dicts layout
+FORMAT_VERSION = "contractors/v2"
+
+# Legacy reviews were stored as "text (date)"; only split off the suffix when it is a real date
+# (5/6/2025, 2025-05-06, May 6, 2025, 6 May 2025, May 2025), not any parenthetical
+_MONTH = (r'(?:January|February|March|April|May|June|July|August|September|October|November|December'
+          r'|Jan|Feb|Mar|Apr|Jun|Jul|Aug|Sept|Sep|Oct|Nov|Dec)\.?')
+LEGACY_REVIEW_DATE = re.compile(
+    r'^(?P<text>.*\S)\s+\((?P<date>'
+    r'\d{1,2}/\d{1,2}/(?:\d{4}|\d{2})'
+    r'|\d{4}-\d{2}-\d{2}'
+    rf'|{_MONTH}\s+(?:\d{{1,2}},?\s+)?\d{{4}}'
+    rf'|\d{{1,2}}\s+{_MONTH}\s+\d{{4}}'
+    r')\)$',
+    re.DOTALL | re.IGNORECASE
+)
+
+def _to_float(value):
+    """Parse a numeric rating, keeping the raw value when it isn't one so nothing is lost on save"""
+    if value is None or isinstance(value, float):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return value
+
+def _to_str(value):
+    """Intern repeated short strings; values scraped from JSON may not be strings at all"""
+    if value is None:
+        return None
+    return sys.intern(value if isinstance(value, str) else str(value))
+
+def _to_int(value):
+    """Parse a founding year, keeping the raw value when it isn't a number, like _to_float"""
+    if value is None or isinstance(value, int):
+        return value
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+@dataclass(slots=True)
+class Review:
+    text: str
+    date: str | None = None
+
+    @property
+    def hash(self):
+        """Short hash of the normalized text; the scraper uses it to deduplicate reviews across refreshes"""
+        normalized = ' '.join(self.text.split()).lower()
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=8).hexdigest()
+
+    @classmethod
+    def parse(cls, value):
+        """Build a review from a Review, a {'text', 'date'} dict or a legacy "text (date)" string"""
+        if isinstance(value, cls):
+            return value
+        if isinstance(value, dict):
+            return cls(value.get('text', ''), value.get('date'))
+        if not isinstance(value, str):
+            value = str(value)
+        match = LEGACY_REVIEW_DATE.match(value)
+        if match:
+            return cls(match.group('text'), _to_str(match.group('date')))
+        return cls(value)
+
+    def to_legacy(self):
+        return f"{self.text} ({self.date})" if self.date else self.text
+
+@dataclass(slots=True)
+class Contractor:
+    contractor_id: str
+    profile_url: str | None = None
+    name: str | None = None
+    rating: float | str | None = None
+    location: str | None = None
+    phone: str | None = None
+    about: str | None = None
+    reviews: list[Review] = field(default_factory=list)
+    founding_year: int | str | None = None
+    state_license: str | None = None
+    number_of_employees: str | None = None
+    last_modified: str | None = None
+    last_updated: str | None = None
+    ai_insight: str | None = None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a contractor from a scraped or legacy JSON dict, coercing string fields to their types"""
+        return cls(
+            contractor_id=data.get('contractor_id'),
+            profile_url=data.get('profile_url'),
+            name=data.get('name'),
+            rating=_to_float(data.get('rating')),
+            location=_to_str(data.get('location')),
+            phone=data.get('phone'),
+            about=data.get('about'),
+            reviews=[Review.parse(review) for review in data.get('reviews') or [] if review is not None],
+            founding_year=_to_int(data.get('founding_year')),
+            state_license=data.get('state_license'),
+            number_of_employees=_to_str(data.get('number_of_employees')),
+            last_modified=data.get('last_modified'),
+            last_updated=data.get('last_updated'),
+            ai_insight=data.get('ai_insight'),
+        )
+
+    def to_dict(self):
+        """JSON view in the shape the web UI expects (string rating/year, "text (date)" reviews)"""
+        return {
+            'profile_url': self.profile_url,
+            'name': self.name,
+            'rating': f"{self.rating:.1f}" if isinstance(self.rating, float) else self.rating,
+            'location': self.location,
+            'phone': self.phone,
+            'about': self.about,
+            'reviews': [review.to_legacy() for review in self.reviews],
+            'founding_year': str(self.founding_year) if isinstance(self.founding_year, int) else self.founding_year,
+            'contractor_id': self.contractor_id,
+            'state_license': self.state_license,
+            'number_of_employees': self.number_of_employees,
+            'last_modified': self.last_modified,
+            'last_updated': self.last_updated,
+            'ai_insight': self.ai_insight,
+        }
+
+    @classmethod
+    def from_row(cls, row):
+        contractor = cls(*row)
+        contractor.reviews = [Review(*review) for review in contractor.reviews]
+        return contractor
+
+    def to_row(self):
+        return [
+            self.contractor_id, self.profile_url, self.name, self.rating, self.location, self.phone,
+            self.about, [[review.text, review.date] for review in self.reviews], self.founding_year,
+            self.state_license, self.number_of_employees, self.last_modified, self.last_updated, self.ai_insight,
+        ]
+
+FIELDS = [f.name for f in fields(Contractor)]
+
+@contextmanager
+def _gc_paused():
+    """Building hundreds of thousands of small objects otherwise triggers repeated, useless GC passes"""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+def load_contractors(path="data/contractors.json"):
+    """Load contractors from the compact row format, falling back to the legacy list of dicts"""
+    with open(path, 'r', encoding='utf-8') as f:
+        text = f.read()
+    with _gc_paused():
+        data = json.loads(text)
+        if isinstance(data, list):
+            return [Contractor.from_dict(c) for c in data]
+        if data.get('format') != FORMAT_VERSION or data.get('fields') != FIELDS:
+            raise ValueError(f"Unsupported contractor data format in {path}")
+        return [Contractor.from_row(row) for row in data['rows']]
+
+def save_contractors(contractors, path="data/contractors.json"):
+    """Write contractors as compact rows, replacing the file atomically so readers never see a partial write"""
+    path = Path(path)
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with _gc_paused():
+        payload = {'format': FORMAT_VERSION, 'fields': FIELDS, 'rows': [c.to_row() for c in contractors]}
+        # json.dumps takes the one-shot C encoder path (json.dump does not), and ASCII escaping is its
+        # fastest mode; non-ASCII text is written as \u escapes, which makes those characters larger on disk
+        text = json.dumps(payload, separators=(',', ':'))
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
@@ -6,8 +6,10 @@ from tqdm import tqdm
 import logging
 import re
 import os
+from dataclasses import replace
 from datetime import datetime
 from cache_manager import CacheManager
+from models import Contractor, Review, load_contractors, save_contractors
 
 # Set up logging
 logging.basicConfig(
@@ -16,6 +18,9 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Fields that come from the search results card rather than the profile page
+LISTING_FIELDS = ('name', 'rating', 'location', 'phone')
+
 class GAFContractorScraper:
     def __init__(self, test_mode=False):
         self.base_url = "https://www.gaf.com/en-us/roofing-contractors/residential"
@@ -42,7 +47,7 @@ class GAFContractorScraper:
             logger.error(f"Error getting last modified date: {e}")
             return None
 
-    def _get_detailed_info(self, page, profile_url):
+    def _get_detailed_info(self, page, profile_url, force=False):
         """Get detailed information from a contractor's profile page"""
         try:
             # Navigate to the profile page and wait for content to load
@@ -57,7 +62,7 @@ class GAFContractorScraper:
             contractor_id = profile_url.split('-')[-1]
             
             # Check if we need to update this contractor's data
-            if not self.cache_manager.needs_update(contractor_id, last_modified):
+            if not force and not self.cache_manager.needs_update(contractor_id, last_modified):
                 logger.info(f"Contractor {contractor_id} data is up to date, skipping...")
                 return None
             
@@ -92,17 +97,19 @@ class GAFContractorScraper:
                 if review_text and len(review_text) > 10:
                     # Clean up the review text
                     review_text = re.sub(r'\s+', ' ', review_text).strip()
-                    if review_text not in seen_reviews:
-                        reviews.append(review_text)
-                        seen_reviews.add(review_text)
+                    review = Review(review_text)
+                    if review.hash not in seen_reviews:
+                        reviews.append(review)
+                        seen_reviews.add(review.hash)
             
             # Get the dates from the review elements
             date_elements = page.query_selector_all('div.contractor-reviews__date')
             dates = [elem.inner_text().strip() for elem in date_elements]
             
-            # Combine reviews with dates if available
+            # Attach dates to reviews if they line up
             if len(dates) == len(reviews):
-                reviews = [f"{review} ({date})" for review, date in zip(reviews, dates)]
+                for review, date in zip(reviews, dates):
+                    review.date = date
             
             detailed_info['reviews'] = reviews
 
@@ -140,7 +147,7 @@ class GAFContractorScraper:
                         if any(x in text for x in ['business since', 'in business since', 'established', 'founded']):
                             match = re.search(r'(?:business since|in business since|established|founded)[:\s]*(\d{4})', text)
                             if match:
-                                detailed_info['founding_year'] = match.group(1)
+                                detailed_info['founding_year'] = int(match.group(1))
                         
                         # State License
                         if any(x in text for x in ['license', 'lic.', 'license number', 'state license']):
@@ -263,11 +270,15 @@ class GAFContractorScraper:
                             if phone_match:
                                 contractor_data['phone'] = phone_match.group()
                             
+                            # Remember the listing so the refresh scheduler can apply changes even if the profile is unchanged
+                            listing = {k: contractor_data.get(k) for k in LISTING_FIELDS}
+                            self.cache_manager.update_listing(profile_url.split('-')[-1], listing)
+                            
                             # Get detailed info from profile page
                             detailed_info = self._get_detailed_info(profile_page, profile_url)
                             if detailed_info:
                                 contractor_data.update(detailed_info)
-                                all_contractors_data.append(contractor_data)
+                                all_contractors_data.append(Contractor.from_dict(contractor_data))
                             
                             # If in test mode, save and exit after first contractor
                             if self.test_mode:
@@ -327,33 +338,82 @@ class GAFContractorScraper:
                 context.close()
                 browser.close()
     
-    def _save_data(self, data):
-        """Save the scraped data to a JSON file"""
+    def refresh_contractors(self, contractors):
+        """Re-fetch the profile pages of the given contractors without crawling the search listing"""
+        refreshed = []
+        with sync_playwright() as p:
+            browser = p.chromium.launch(headless=True)
+            context = browser.new_context()
+            profile_page = context.new_page()
+            
+            try:
+                for contractor in contractors:
+                    if not contractor.profile_url:
+                        continue
+                    try:
+                        # Read the latest listing before the profile fetch clears the changed flag
+                        listing = None
+                        if self.cache_manager.listing_changed(contractor.contractor_id):
+                            listing = self.cache_manager.get_listing(contractor.contractor_id)
+                        # Record the attempt first so the scheduler backs off on profiles that keep failing
+                        self.cache_manager.record_refresh_attempt(contractor.contractor_id)
+                        detailed_info = self._get_detailed_info(profile_page, contractor.profile_url, force=True)
+                        if detailed_info:
+                            # Keep the AI insight, take listing fields from the last crawl and details from the
+                            # profile; fields missing from a partly rendered page keep their stored values
+                            merged = contractor.to_dict()
+                            merged.update(listing or {})
+                            merged.update({k: v for k, v in detailed_info.items() if v is not None})
+                            refreshed.append(Contractor.from_dict(merged))
+                    except Exception as e:
+                        logger.error(f"Error refreshing contractor {contractor.contractor_id}: {str(e)}")
+            finally:
+                context.close()
+                browser.close()
+        
+        if refreshed and self._save_data(refreshed, partial=True):
+            logger.info(f"Refreshed {len(refreshed)} of {len(contractors)} contractors")
+            return refreshed
+        return []
+    
+    def _save_data(self, data, partial=False):
+        """Save the scraped contractors to the data file.
+
+        With `partial`, `data` is only a batch of the dataset, so the save is aborted
+        rather than overwriting the file with just the batch if it can't be read.
+        """
         output_file = self.data_dir / "contractors.json"
         # Load existing data if it exists
         existing_data = []
         if output_file.exists():
             try:
-                with open(output_file, 'r', encoding='utf-8') as f:
-                    existing_data = json.load(f)
+                existing_data = load_contractors(output_file)
             except Exception as e:
                 logger.error(f"Error loading existing data: {e}")
+                if partial:
+                    logger.error("Not saving partial update to avoid dropping existing contractors")
+                    return False
         
         # Create a map of existing contractors by ID
-        existing_contractors = {c.get('contractor_id'): c for c in existing_data}
+        existing_contractors = {c.contractor_id: c for c in existing_data}
         
         # Update or add new contractors
         for contractor in data:
-            contractor_id = contractor.get('contractor_id')
-            if contractor_id:
-                existing_contractors[contractor_id] = contractor
+            if contractor.contractor_id:
+                previous = existing_contractors.get(contractor.contractor_id)
+                if previous:
+                    # The profile only shows recent reviews; keep older ones that weren't scraped again
+                    seen_reviews = {review.hash for review in contractor.reviews}
+                    older_reviews = [review for review in previous.reviews if review.hash not in seen_reviews]
+                    contractor = replace(contractor, reviews=contractor.reviews + older_reviews)
+                existing_contractors[contractor.contractor_id] = contractor
         
         # Convert back to list
         updated_data = list(existing_contractors.values())
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(updated_data, f, indent=2, ensure_ascii=False)
+        save_contractors(updated_data, output_file)
         logger.info(f"Data saved to {output_file} with {len(updated_data)} contractors")
+        return True
 
 if __name__ == '__main__':
     scraper = GAFContractorScraper(test_mode=True)
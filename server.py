@@ -1,11 +1,16 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, send_file
 from flask_cors import CORS
-import json
 import threading
 import time
+import os
+from collections import Counter, deque
+from datetime import datetime, timedelta
 from queue import Queue
 from scraper import GAFContractorScraper
 from generate_insights import generate_insights
+from cache_manager import CacheManager
+from analytics import ContractorFrame, compute_stats, export_frame
+from models import load_contractors as load_contractor_models
 from pathlib import Path
 import logging
 import sys
@@ -28,6 +33,23 @@ request_queue = Queue()
 is_processing = False
 current_position = 0
 
+# Background refresh settings, overridable through the environment
+REFRESH_BUDGET_PER_HOUR = int(os.getenv('REFRESH_BUDGET_PER_HOUR', '60'))
+REFRESH_BATCH_SIZE = int(os.getenv('REFRESH_BATCH_SIZE', '5'))
+REFRESH_STALE_AFTER_HOURS = float(os.getenv('REFRESH_STALE_AFTER_HOURS', '24'))
+
+# Full crawls and background refreshes both rewrite the data files, so only one may run at a time
+scrape_lock = threading.Lock()
+
+# Number of times each contractor's details were opened in the UI
+contractor_views = Counter()
+
+# IDs from the last load of the data file, so views are only counted for real contractors
+known_contractor_ids = set()
+
+# Columnar view of the contractor data for /api/stats and exports
+contractor_frame = ContractorFrame()
+
 # Ensure data directory exists
 data_dir = Path('data')
 data_dir.mkdir(exist_ok=True)
@@ -58,15 +80,18 @@ def check_and_initialize_data():
             
         # Generate insights after scraping
         logger.info("Scraping completed, generating insights...")
-        generate_insights()
+        with scrape_lock:
+            generate_insights()
         return True
     logger.info("Data file exists, no initialization needed")
     return False
 
 def load_contractors():
+    global known_contractor_ids
     try:
-        with open('data/contractors.json', 'r') as f:
-            return json.load(f)
+        contractors = load_contractor_models('data/contractors.json')
+        known_contractor_ids = {c.contractor_id for c in contractors}
+        return contractors
     except Exception as e:
         logger.error(f"Error loading contractors: {e}")
         return []
@@ -80,19 +105,20 @@ def process_queue():
             
             try:
                 if request.get('type') == 'refresh':
-                    # Initialize and run the scraper
-                    scraper = GAFContractorScraper(test_mode=False)
-                    try:
-                        logger.info("Starting scraping process...")
-                        scraper.start_scraping()
-                        logger.info("Scraping completed, generating insights...")
+                    with scrape_lock:
+                        # Initialize the scraper under the lock so its cache snapshot includes any background refresh
+                        scraper = GAFContractorScraper(test_mode=False)
                         try:
-                            generate_insights()
-                            logger.info("Insights generation completed successfully")
-                        except Exception as insight_error:
-                            logger.error(f"Error generating insights: {insight_error}")
-                    except Exception as e:
-                        logger.error(f"Error during scraping: {e}")
+                            logger.info("Starting scraping process...")
+                            scraper.start_scraping()
+                            logger.info("Scraping completed, generating insights...")
+                            try:
+                                generate_insights()
+                                logger.info("Insights generation completed successfully")
+                            except Exception as insight_error:
+                                logger.error(f"Error generating insights: {insight_error}")
+                        except Exception as e:
+                            logger.error(f"Error during scraping: {e}")
                 else:
                     # Handle other types of requests if needed
                     time.sleep(2)  # Default processing time for other requests
@@ -106,11 +132,108 @@ def process_queue():
                 
         time.sleep(0.1)  # Small delay to prevent CPU overuse
 
+class RefreshScheduler:
+    """Refreshes stale contractors in small batches, staying within an hourly crawl budget.
+
+    Contractors are picked oldest first; within the same age (in days) the most viewed go
+    first, then the best rated, and after that the ones whose search listing changed.
+    """
+
+    def __init__(self, budget_per_hour, batch_size, stale_after_hours):
+        self.budget_per_hour = budget_per_hour
+        self.batch_size = batch_size
+        self.stale_after = timedelta(hours=stale_after_hours)
+        self.recent_fetches = deque()
+
+    @property
+    def interval(self):
+        """Seconds between batches, spreading the hourly budget evenly"""
+        return 3600 * self.batch_size / self.budget_per_hour
+
+    def remaining_budget(self, now):
+        while self.recent_fetches and now - self.recent_fetches[0] >= 3600:
+            self.recent_fetches.popleft()
+        return max(0, self.budget_per_hour - len(self.recent_fetches))
+
+    def _last_updated(self, contractor, cache_manager):
+        last_updated = contractor.last_updated or cache_manager.get_contractor_last_updated(contractor.contractor_id)
+        if not last_updated:
+            return None
+        try:
+            return datetime.fromisoformat(last_updated)
+        except ValueError:
+            return None
+
+    def _priority(self, contractor, last_updated, now, cache_manager):
+        contractor_id = contractor.contractor_id
+        age_days = (now - last_updated).days if last_updated else float('inf')
+        rating = contractor.rating if isinstance(contractor.rating, float) else 0.0
+        listing_changed = cache_manager.listing_changed(contractor_id)
+        # Sorted ascending, so every component is negated
+        return (-age_days, -contractor_views[contractor_id], -rating, not listing_changed)
+
+    def select_batch(self, contractors, limit):
+        """Return up to `limit` stale contractors in refresh order"""
+        now = datetime.now()
+        cache_manager = CacheManager()
+        candidates = []
+        for contractor in contractors:
+            if not contractor.contractor_id or not contractor.profile_url:
+                continue
+            last_updated = self._last_updated(contractor, cache_manager)
+            if last_updated and now - last_updated < self.stale_after:
+                continue
+            # Back off on profiles that failed recently, so they don't eat the budget every batch
+            last_attempt = cache_manager.get_refresh_attempt(contractor.contractor_id)
+            if last_attempt and now - datetime.fromisoformat(last_attempt) < self.stale_after:
+                continue
+            candidates.append((self._priority(contractor, last_updated, now, cache_manager), contractor))
+        candidates.sort(key=lambda candidate: candidate[0])
+        return [contractor for _, contractor in candidates[:limit]]
+
+    def run_once(self):
+        """Refresh one batch if the budget allows and no full crawl is running"""
+        now = time.time()
+        limit = min(self.batch_size, self.remaining_budget(now))
+        if limit == 0:
+            logger.info("Refresh budget for this hour is used up, skipping batch")
+            return []
+        if not scrape_lock.acquire(blocking=False):
+            logger.info("Full crawl in progress, skipping background refresh")
+            return []
+        try:
+            batch = self.select_batch(load_contractors(), limit)
+            if not batch:
+                return []
+            logger.info(f"Background refresh of {len(batch)} contractors: {[c.contractor_id for c in batch]}")
+            self.recent_fetches.extend([now] * len(batch))
+            return GAFContractorScraper(test_mode=False).refresh_contractors(batch)
+        except Exception as e:
+            logger.error(f"Error during background refresh: {e}")
+            return []
+        finally:
+            scrape_lock.release()
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            self.run_once()
+
 # Start the queue processing thread
 queue_thread = threading.Thread(target=process_queue, daemon=True)
 queue_thread.start()
 logger.info("Queue processing thread started")
 
+# Start the background refresh thread unless the budget disables it. `python server.py` runs with the
+# debug reloader, which also imports this module in a file-watching parent process; only the serving
+# child (WERKZEUG_RUN_MAIN) may scrape, otherwise two schedulers share the budget and the data files.
+refresh_scheduler = RefreshScheduler(REFRESH_BUDGET_PER_HOUR, REFRESH_BATCH_SIZE, REFRESH_STALE_AFTER_HOURS)
+is_serving_process = __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'
+if REFRESH_BUDGET_PER_HOUR > 0 and REFRESH_BATCH_SIZE > 0 and is_serving_process:
+    scheduler_thread = threading.Thread(target=refresh_scheduler.run, daemon=True)
+    scheduler_thread.start()
+    logger.info(f"Refresh scheduler started ({REFRESH_BUDGET_PER_HOUR} contractors/hour, batches of {REFRESH_BATCH_SIZE})")
+
 @app.route('/')
 def index():
     print("\n" + "="*50)
@@ -192,9 +315,37 @@ def queue_status():
 def get_contractors():
     # If no one is in queue and not processing, return data immediately
     if request_queue.empty() and not is_processing:
-        return jsonify(load_contractors())
+        return jsonify([contractor.to_dict() for contractor in load_contractors()])
     return jsonify({"error": "Please wait for your turn"}), 429
 
+@app.route('/api/contractors/<contractor_id>/view', methods=['POST'])
+def record_contractor_view(contractor_id):
+    # Views feed the refresh priority, popular contractors are kept fresher
+    if contractor_id not in known_contractor_ids:
+        return jsonify({'error': 'Unknown contractor'}), 404
+    contractor_views[contractor_id] += 1
+    return jsonify({'status': 'success'})
+
+@app.route('/api/stats', methods=['GET'])
+def get_stats():
+    try:
+        return jsonify(compute_stats(contractor_frame.get()))
+    except Exception as e:
+        logger.error(f"Error computing stats: {e}")
+        return jsonify({'error': 'Could not compute stats'}), 500
+
+@app.route('/api/export/<fmt>', methods=['GET'])
+def export_contractors(fmt):
+    if fmt not in ('csv', 'parquet'):
+        return jsonify({'error': f'Unsupported export format: {fmt}'}), 400
+    try:
+        buffer = export_frame(contractor_frame.get(), fmt)
+    except ImportError as e:
+        logger.error(f"Parquet export unavailable: {e}")
+        return jsonify({'error': 'Parquet export requires pyarrow'}), 501
+    mimetype = 'text/csv' if fmt == 'csv' else 'application/octet-stream'
+    return send_file(buffer, mimetype=mimetype, as_attachment=True, download_name=f'contractors.{fmt}')
+
 if __name__ == '__main__':
     logger.info("Starting Flask application...")
     logger.info("Server will be available at http://localhost:5001")